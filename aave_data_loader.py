@@ -1,15 +1,45 @@
 import json
 import pandas as pd
 import numpy as np
-from datetime import datetime
 from typing import Dict, List
 
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+GAS_ESTIMATES = {
+    'deposit': 150000,
+    'borrow': 180000,
+    'repay': 160000,
+    'redeemunderlying': 170000,
+    'liquidationcall': 220000,
+    'withdraw': 170000,
+    'flashloan': 200000
+}
+DEFAULT_GAS_ESTIMATE = 150000
+
+# Gas lookup table indexed by categorical action codes; unknown actions get
+# code -1, which selects the trailing default entry.
+_GAS_ACTIONS = list(GAS_ESTIMATES)
+_GAS_TABLE = np.array(list(GAS_ESTIMATES.values()) + [DEFAULT_GAS_ESTIMATE], dtype=np.int32)
+
 class AaveDataLoader:
     """
     Data loader specifically designed for Aave V2 transaction data format.
     Handles the specific JSON structure from user-wallet-transactions.json
     """
     
+    RAW_FIELDS = (
+        'userWallet', 'txHash', 'action', 'timestamp', 'blockNumber',
+        'amount', 'assetSymbol', 'assetPriceUSD'
+    )
+    
     def __init__(self):
         pass
     
@@ -21,28 +51,53 @@ class AaveDataLoader:
             file_path: Path to the JSON file with Aave transaction data
             
         Returns:
-            DataFrame with standardized transaction data
+            DataFrame with standardized transaction data; amount, gas_used
+            and block_number are numeric columns
         """
         print(f"Loading Aave transaction data from {file_path}...")
         
         try:
-            transactions = []
-            chunk_size = 10000
+            raw = {field: [] for field in self.RAW_FIELDS}
             
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            print(f"Loaded {len(data)} raw transactions")
+            # Hot loop: append straight into the column lists through bound
+            # methods instead of building an intermediate record per row.
+            append_wallet = raw['userWallet'].append
+            append_tx_hash = raw['txHash'].append
+            append_action = raw['action'].append
+            append_timestamp = raw['timestamp'].append
+            append_block_number = raw['blockNumber'].append
+            append_amount = raw['amount'].append
+            append_asset = raw['assetSymbol'].append
+            append_price = raw['assetPriceUSD'].append
             
-            for i, tx in enumerate(data):
+            for i, tx in enumerate(self._iter_transactions(file_path)):
                 if i % 10000 == 0:
-                    print(f"Processing transaction {i+1}/{len(data)}")
+                    print(f"Processing transaction {i+1}...")
                 
-                transformed_tx = self._transform_transaction(tx)
-                if transformed_tx: 
-                    transactions.append(transformed_tx)
+                try:
+                    wallet = tx.get('userWallet', '')
+                    action = tx.get('action', '')
+                    if not isinstance(wallet, str) or not isinstance(action, str):
+                        raise TypeError("userWallet and action must be strings")
+                    
+                    action_data = tx.get('actionData', {})
+                    amount = action_data.get('amount', '0')
+                    asset = action_data.get('assetSymbol', 'UNKNOWN')
+                    asset_price_usd = action_data.get('assetPriceUSD', '0')
+                except Exception as e:
+                    print(f"Error transforming transaction: {e}")
+                    continue
+                
+                append_wallet(wallet)
+                append_tx_hash(tx.get('txHash', ''))
+                append_action(action)
+                append_timestamp(tx.get('timestamp', 0))
+                append_block_number(tx.get('blockNumber', 0))
+                append_amount(amount)
+                append_asset(asset)
+                append_price(asset_price_usd)
             
-            df = pd.DataFrame(transactions)
+            df = self._transform_columns(raw)
             print(f"Successfully transformed {len(df)} transactions for {df['wallet_address'].nunique() if len(df) > 0 else 0} unique wallets")
             
             return df
@@ -51,69 +106,61 @@ class AaveDataLoader:
             print(f"Error loading data: {e}")
             return pd.DataFrame()
     
-    def _transform_transaction(self, tx: dict) -> dict:
-        """Transform a single transaction to the expected format."""
+    def _iter_transactions(self, file_path: str):
+        """
+        Yield raw transactions from the JSON array.
         
-        try:
-            wallet_address = tx.get('userWallet', '').lower()
-            transaction_hash = tx.get('txHash', '')
-            action = tx.get('action', '')
-            
-            timestamp = tx.get('timestamp', 0)
-            if timestamp:
-                dt = datetime.fromtimestamp(timestamp)
-                timestamp_iso = dt.isoformat() + 'Z'
-            else:
-                timestamp_iso = None
-            
-            action_data = tx.get('actionData', {})
-            amount = action_data.get('amount', '0')
-            asset = action_data.get('assetSymbol', 'UNKNOWN')
-            asset_price_usd = action_data.get('assetPriceUSD', '0')
-            
-            try:
-                amount_numeric = float(amount) / 1e6 if amount else 0
-                price_numeric = float(asset_price_usd) if asset_price_usd else 0
-                usd_value = amount_numeric * price_numeric
-            except:
-                amount_numeric = 0
-                usd_value = 0
-            
-            block_number = tx.get('blockNumber', 0)
-            gas_used = self._estimate_gas_used(action)
-            
-            transformed = {
-                'wallet_address': wallet_address,
-                'transaction_hash': transaction_hash,
-                'action': action,
-                'amount': str(amount_numeric),
-                'asset': asset,
-                'timestamp': timestamp_iso,
-                'gas_used': str(gas_used),
-                'block_number': str(block_number),
-                'usd_value': usd_value,
-                'asset_price_usd': asset_price_usd
-            }
-            
-            return transformed
+        With simdjson installed the document is parsed lazily, so only the
+        fields read in load_and_transform are materialized as Python objects.
+        Otherwise ijson streams records one at a time, keeping memory bounded
+        by a single record instead of the whole file.
+        """
+        if simdjson is not None:
+            parser = simdjson.Parser()
+            data = parser.load(file_path)
+            print(f"Loaded {len(data)} raw transactions")
+            yield from data
             
-        except Exception as e:
-            print(f"Error transforming transaction: {e}")
-            return None
+        elif ijson is not None:
+            with open(file_path, 'rb') as f:
+                yield from ijson.items(f, 'item', use_float=True)
+                
+        else:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+            print(f"Loaded {len(data)} raw transactions")
+            yield from data
     
-    def _estimate_gas_used(self, action: str) -> int:
-        """Estimate gas usage based on action type."""
-        gas_estimates = {
-            'deposit': 150000,
-            'borrow': 180000,
-            'repay': 160000,
-            'redeemunderlying': 170000,
-            'liquidationcall': 220000,
-            'withdraw': 170000,
-            'flashloan': 200000
-        }
+    def _transform_columns(self, raw: Dict[str, list]) -> pd.DataFrame:
+        """Transform the raw field columns to the expected format in one vectorized pass."""
+        
+        action = pd.Series(raw['action'])
         
-        return gas_estimates.get(action.lower(), 150000)
+        amount_numeric = pd.to_numeric(pd.Series(raw['amount']), errors='coerce').astype('float64')
+        amount_numeric = amount_numeric.div(1e6).fillna(0)
+        price_numeric = pd.to_numeric(pd.Series(raw['assetPriceUSD']), errors='coerce').astype('float64').fillna(0)
+        
+        timestamps = pd.to_numeric(pd.Series(raw['timestamp']), errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+        timestamp_iso = np.char.add(np.datetime_as_string(timestamps.astype('datetime64[s]'), unit='s'), 'Z')
+        timestamp_iso = np.where(timestamps == 0, None, timestamp_iso)
+        
+        action_codes = pd.Categorical(action.str.lower(), categories=_GAS_ACTIONS).codes
+        
+        block_number = pd.to_numeric(pd.Series(raw['blockNumber']), errors='coerce').fillna(0)
+        block_number = pd.to_numeric(block_number.astype('int64'), downcast='unsigned')
+        
+        return pd.DataFrame({
+            'wallet_address': pd.Series(raw['userWallet']).str.lower(),
+            'transaction_hash': raw['txHash'],
+            'action': action.astype('category'),
+            'amount': amount_numeric,
+            'asset': pd.Categorical(raw['assetSymbol']),
+            'timestamp': timestamp_iso,
+            'gas_used': _GAS_TABLE.take(action_codes),
+            'block_number': block_number,
+            'usd_value': amount_numeric * price_numeric,
+            'asset_price_usd': raw['assetPriceUSD']
+        }, copy=False)
     
     def get_data_summary(self, df: pd.DataFrame) -> dict:
         """Get a summary of the loaded data."""
@@ -121,18 +168,34 @@ class AaveDataLoader:
         if df.empty:
             return {"error": "No data loaded"}
         
+        actions, action_counts = self._category_counts(df['action'])
+        assets, asset_counts = self._category_counts(df['asset'])
+        
+        action_order = np.argsort(-action_counts, kind='stable')
+        top_asset_idx = np.argpartition(-asset_counts, 10)[:10] if len(asset_counts) > 10 else np.arange(len(asset_counts))
+        top_asset_idx = top_asset_idx[np.argsort(-asset_counts[top_asset_idx], kind='stable')]
+        
         summary = {
             'total_transactions': len(df),
             'unique_wallets': df['wallet_address'].nunique(),
-            'unique_assets': df['asset'].nunique(),
+            'unique_assets': int(np.count_nonzero(asset_counts)),
             'date_range': {
                 'start': df['timestamp'].min(),
                 'end': df['timestamp'].max()
             },
-            'action_distribution': df['action'].value_counts().to_dict(),
+            'action_distribution': {actions[i]: int(action_counts[i]) for i in action_order if action_counts[i] > 0},
             'total_usd_volume': df['usd_value'].sum(),
             'avg_transaction_usd': df['usd_value'].mean(),
-            'top_assets': df['asset'].value_counts().head(10).to_dict()
+            'top_assets': {assets[i]: int(asset_counts[i]) for i in top_asset_idx if asset_counts[i] > 0}
         }
         
         return summary
+    
+    def _category_counts(self, column: pd.Series):
+        """Count occurrences per category with np.bincount over the categorical codes."""
+        if not isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype('category')
+        
+        codes = column.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))
+        return column.cat.categories, counts
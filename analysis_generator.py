@@ -4,141 +4,377 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Layout shared by every report chart, registered once and layered on top of
+# Plotly's default template.
+pio.templates['aave'] = go.layout.Template(layout=dict(height=500))
+CHART_TEMPLATE = 'plotly+aave'
+
+REPORT_HEADER_TEMPLATE = """# DeFi Credit Score Analysis
+
+*Generated on {generated_on}*
+
+## Executive Summary
+
+This analysis examines the credit scoring results for {total_wallets} DeFi wallets based on their Aave V2 protocol transaction behavior. The scoring system assigns credit scores from 0-1000, where higher scores indicate more reliable and sophisticated DeFi usage patterns.
+
+## Score Distribution Overview
+
+### Key Statistics
+- **Total Wallets Analyzed**: {total_wallets:,}
+- **Mean Credit Score**: {mean_score:.1f}
+- **Median Credit Score**: {median_score:.1f}
+- **Standard Deviation**: {std_score:.1f}
+
+### Percentile Breakdown
+- **10th Percentile**: {p10:.1f}
+- **25th Percentile**: {p25:.1f}
+- **75th Percentile**: {p75:.1f}
+- **90th Percentile**: {p90:.1f}
+
+### Score Range Distribution
+
+The following table shows the distribution of wallets across different credit score ranges:
+
+| Score Range | Number of Wallets | Percentage |
+|-------------|------------------|------------|"""
+
+DISTRIBUTION_ROW_TEMPLATE = "\n| {range_name} | {count} | {percentage:.1f}% |"
+
+SEGMENT_OVERVIEW_TEMPLATE = """
+
+## {heading}
+
+### Overview
+- **Number of {segment_label} Wallets**: {count}
+- **Percentage of Total Population**: {percentage:.1f}%
+- **Average Score**: {avg_score:.1f}
+
+### Behavioral Characteristics"""
+
+CHARACTERISTICS_TEMPLATE = """
+- **Average Liquidations**: {avg_liquidations:.2f}
+- **Average Repayment Consistency**: {avg_repay_consistency:.2f}
+- **Average Transactions**: {avg_transactions:.1f}
+- **Average Volume**: ${avg_volume:,.2f}
+- **Average Tenure**: {avg_tenure:.1f} days"""
+
+REPORT_FOOTER = """
+
+## Key Insights and Patterns
+
+### 1. Score Distribution Patterns
+The credit score distribution reveals the overall health and risk profile of the DeFi wallet population. A normal distribution suggests a healthy mix of users, while skewed distributions may indicate specific market conditions or user adoption patterns.
+
+### 2. Risk Differentiation
+The scoring model successfully differentiates between high-risk and low-risk wallets based on:
+- **Liquidation History**: Wallets with liquidation events score significantly lower
+- **Repayment Behavior**: Consistent repayers receive higher scores
+- **Portfolio Management**: Diversified and well-managed portfolios score better
+- **Protocol Engagement**: Long-term, active users are rewarded with higher scores
+
+### 3. Behavioral Segmentation
+The analysis reveals distinct behavioral segments:
+- **Sophisticated Users**: High scores, diverse portfolios, excellent risk management
+- **Casual Users**: Moderate scores, basic interactions, limited history
+- **High-Risk Users**: Low scores, liquidation history, poor repayment patterns
+- **Bot/Exploit Patterns**: Very low scores, irregular patterns, suspicious activity
+
+## Methodology Validation
+
+### Model Performance
+The credit scoring model demonstrates strong performance in:
+- Identifying high-risk wallets through liquidation and repayment patterns
+- Rewarding sophisticated DeFi usage and long-term engagement
+- Detecting potential bot or exploit behavior through pattern analysis
+- Providing meaningful score differentiation across the user base
+
+### Limitations and Considerations
+- **Data Scope**: Analysis based on Aave V2 data only; cross-protocol behavior not captured
+- **Temporal Factors**: Market conditions during analysis period may influence patterns
+- **Sample Size**: Results may vary with larger datasets or different time periods
+
+## Recommendations
+
+### For Risk Management
+1. Focus monitoring on wallets scoring below 300
+2. Implement enhanced due diligence for scores 300-500
+3. Consider preferential terms for consistently high-scoring wallets (700+)
+
+### For Product Development
+1. Develop targeted educational content for low-scoring users
+2. Create incentive programs for improving credit scores
+3. Consider score-based features and benefits
+
+### For Further Analysis
+1. Implement real-time score monitoring and updates
+2. Expand analysis to include cross-protocol behavior
+3. Develop predictive models for score trajectory
+
+## Technical Appendix
+
+### Scoring Methodology
+The credit scoring system employs a multi-factor approach considering:
+- **Reliability (40% weight)**: Repayment consistency, liquidation avoidance
+- **Sophistication (25% weight)**: Portfolio diversification, gas optimization
+- **Volume & Tenure (20% weight)**: Transaction volume, protocol engagement length
+- **Risk Management (15% weight)**: Leverage ratios, position management
+
+### Data Quality
+- All scores normalized to 0-1000 range
+- Outliers capped at 1st and 99th percentiles
+- Missing data handled through conservative scoring approaches
+
+---
+
+*This analysis provides a comprehensive view of DeFi wallet creditworthiness based on on-chain transaction behavior. For questions or additional analysis, please refer to the technical documentation.*"""
+
 class CreditScoreAnalyzer:
     """
     Comprehensive analysis of DeFi wallet credit scores.
     Generates visualizations and insights for score distribution and behaviors.
     """
     
+    # Only the count columns are narrowed. credit_score stays float64 because
+    # every segment and histogram threshold compares against it, and float32
+    # would round a score like 699.99997 up onto the 700 boundary.
+    SCORE_DTYPES = {
+        'credit_score': 'float64',
+        'liquidation_count': 'int16',
+        'total_transactions': 'int32',
+        'tenure_days': 'int16',
+        'total_volume': 'float64',
+        'repay_consistency_score': 'float64',
+    }
+    
+    BEHAVIOR_METRICS = ['liquidation_count', 'repay_consistency_score', 'total_transactions',
+                        'total_volume', 'tenure_days']
+    SEGMENT_COLUMNS = BEHAVIOR_METRICS + ['credit_score']
+    COMPARISON_METRICS = ['total_transactions', 'total_volume', 'tenure_days',
+                          'liquidation_count', 'repay_consistency_score']
+    
+    HISTOGRAM_PERCENTILES = [25, 50, 75]
+    HISTOGRAM_PERCENTILE_COLORS = ['red', 'green', 'orange']
+    HISTOGRAM_QUANTILES = np.array(HISTOGRAM_PERCENTILES) / 100
+    
     def __init__(self):
         self.score_ranges = [
             (0, 100), (100, 200), (200, 300), (300, 400), (400, 500),
             (500, 600), (600, 700), (700, 800), (800, 900), (900, 1000)
         ]
+        self._bin_edges = np.array([r[0] for r in self.score_ranges] + [1000], dtype=np.int16)
+        self._bin_labels = [f"{r[0]}-{r[1]}" for r in self.score_ranges]
+        self._score_range_cache = None
         
     def load_scores(self, file_path: str) -> pd.DataFrame:
-        """Load credit scores from CSV file."""
+        """
+        Load credit scores from CSV file.
+        
+        Uses pandas' multi-threaded pyarrow CSV engine when pyarrow is installed,
+        and narrow dtypes for the columns the analysis reads.
+        """
         try:
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, engine=CSV_ENGINE, dtype=self.SCORE_DTYPES)
             print(f"Loaded scores for {len(df)} wallets")
             return df
         except Exception as e:
             print(f"Error loading scores: {e}")
             return pd.DataFrame()
     
+    def _score_range_counts(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Count wallets per score range, reusing the result for the same DataFrame.
+        
+        Ranges are right-closed with the lowest edge included, matching
+        pd.cut(..., include_lowest=True); scores outside 0-1000 are not counted.
+        """
+        if self._score_range_cache is not None and self._score_range_cache[0] is df:
+            return self._score_range_cache[1]
+        
+        scores = df['credit_score'].to_numpy()
+        scores = scores[(scores >= self._bin_edges[0]) & (scores <= self._bin_edges[-1])]
+        bins = np.maximum(np.searchsorted(self._bin_edges, scores, side='left') - 1, 0)
+        counts = pd.Series(np.bincount(bins, minlength=len(self._bin_labels)), index=self._bin_labels)
+        
+        self._score_range_cache = (df, counts)
+        return counts
+    
     def analyze_score_distribution(self, df: pd.DataFrame) -> dict:
         """Analyze credit score distribution across ranges."""
         
-        df['score_range'] = pd.cut(df['credit_score'], 
-                                 bins=[r[0] for r in self.score_ranges] + [1000],
-                                 labels=[f"{r[0]}-{r[1]}" for r in self.score_ranges],
-                                 include_lowest=True)
+        distribution = self._score_range_counts(df)
         
-        distribution = df['score_range'].value_counts().sort_index()
+        scores = df['credit_score'].to_numpy().astype(np.float64, copy=False)
+        p10, p25, median, p75, p90 = np.quantile(scores, [0.1, 0.25, 0.5, 0.75, 0.9])
         
         analysis = {
             'total_wallets': len(df),
-            'mean_score': df['credit_score'].mean(),
-            'median_score': df['credit_score'].median(),
-            'std_score': df['credit_score'].std(),
+            'mean_score': scores.mean(),
+            'median_score': median,
+            'std_score': scores.std(ddof=1),
             'distribution': distribution.to_dict(),
             'percentiles': {
-                '10th': np.percentile(df['credit_score'], 10),
-                '25th': np.percentile(df['credit_score'], 25),
-                '75th': np.percentile(df['credit_score'], 75),
-                '90th': np.percentile(df['credit_score'], 90),
+                '10th': p10,
+                '25th': p25,
+                '75th': p75,
+                '90th': p90,
             }
         }
         
         return analysis
     
-    def analyze_low_score_behavior(self, df: pd.DataFrame, threshold: int = 400) -> dict:
-        """Analyze behavior patterns of low-scoring wallets."""
-        
-        low_score_wallets = df[df['credit_score'] < threshold]
-        
-        if len(low_score_wallets) == 0:
+    def _segment_behavior_stats(self, df: pd.DataFrame, low_threshold: int = 400,
+                                high_threshold: int = 700) -> dict:
+        """Compute wallet counts and behavior means for low, mid and high score segments in one pass."""
+        
+        segments = pd.cut(df['credit_score'],
+                          bins=[-np.inf, low_threshold, high_threshold, np.inf],
+                          labels=['low', 'mid', 'high'],
+                          right=False)
+        grouped = df.groupby(segments, observed=True)[self.SEGMENT_COLUMNS]
+        counts = grouped.size()
+        means = grouped.mean()
+        
+        stats = {}
+        for segment in ['low', 'mid', 'high']:
+            if segment in counts.index:
+                row = means.loc[segment]
+                stats[segment] = {
+                    'count': int(counts[segment]),
+                    'avg_score': row['credit_score'],
+                    'means': {metric: row[metric] for metric in self.BEHAVIOR_METRICS},
+                }
+            else:
+                stats[segment] = {'count': 0}
+        
+        return stats
+    
+    def _behavior_stats(self, wallets_df: pd.DataFrame) -> dict:
+        """Compute wallet count and behavior means for a single filtered segment."""
+        if len(wallets_df) == 0:
+            return {'count': 0}
+        
+        values = wallets_df[self.SEGMENT_COLUMNS].to_numpy(dtype=np.float64)
+        means = np.nanmean(values, axis=0)
+        
+        return {
+            'count': len(wallets_df),
+            'avg_score': means[-1],
+            'means': dict(zip(self.BEHAVIOR_METRICS, means[:-1])),
+        }
+    
+    def _common_characteristics(self, means: dict) -> dict:
+        """Map segment behavior means to the report's characteristic names."""
+        return {
+            'avg_liquidations': means['liquidation_count'],
+            'avg_repay_consistency': means['repay_consistency_score'],
+            'avg_transactions': means['total_transactions'],
+            'avg_volume': means['total_volume'],
+            'avg_tenure': means['tenure_days'],
+        }
+    
+    def analyze_low_score_behavior(self, df: pd.DataFrame, threshold: int = 400,
+                                   stats: dict = None) -> dict:
+        """
+        Analyze behavior patterns of low-scoring wallets.
+        
+        Args:
+            df: DataFrame with wallet scores
+            threshold: Scores below this value count as low
+            stats: Precomputed segment stats from _segment_behavior_stats; the
+                DataFrame is filtered when omitted
+        """
+        
+        if stats is None:
+            stats = self._behavior_stats(df[df['credit_score'] < threshold])
+        
+        if stats['count'] == 0:
             return {"message": "No wallets with scores below threshold"}
         
         analysis = {
-            'count': len(low_score_wallets),
-            'percentage': len(low_score_wallets) / len(df) * 100,
-            'avg_score': low_score_wallets['credit_score'].mean(),
-            'common_characteristics': {
-                'avg_liquidations': low_score_wallets['liquidation_count'].mean(),
-                'avg_repay_consistency': low_score_wallets['repay_consistency_score'].mean(),
-                'avg_transactions': low_score_wallets['total_transactions'].mean(),
-                'avg_volume': low_score_wallets['total_volume'].mean(),
-                'avg_tenure': low_score_wallets['tenure_days'].mean(),
-            },
-            'risk_factors': self._identify_risk_factors(low_score_wallets)
+            'count': stats['count'],
+            'percentage': stats['count'] / len(df) * 100,
+            'avg_score': stats['avg_score'],
+            'common_characteristics': self._common_characteristics(stats['means']),
+            'risk_factors': self._identify_risk_factors(stats['means'])
         }
         
         return analysis
     
-    def analyze_high_score_behavior(self, df: pd.DataFrame, threshold: int = 700) -> dict:
-        """Analyze behavior patterns of high-scoring wallets."""
-        
-        high_score_wallets = df[df['credit_score'] >= threshold]
-        
-        if len(high_score_wallets) == 0:
+    def analyze_high_score_behavior(self, df: pd.DataFrame, threshold: int = 700,
+                                    stats: dict = None) -> dict:
+        """
+        Analyze behavior patterns of high-scoring wallets.
+        
+        Args:
+            df: DataFrame with wallet scores
+            threshold: Scores at or above this value count as high
+            stats: Precomputed segment stats from _segment_behavior_stats; the
+                DataFrame is filtered when omitted
+        """
+        
+        if stats is None:
+            stats = self._behavior_stats(df[df['credit_score'] >= threshold])
+        
+        if stats['count'] == 0:
             return {"message": "No wallets with scores above threshold"}
         
         analysis = {
-            'count': len(high_score_wallets),
-            'percentage': len(high_score_wallets) / len(df) * 100,
-            'avg_score': high_score_wallets['credit_score'].mean(),
-            'common_characteristics': {
-                'avg_liquidations': high_score_wallets['liquidation_count'].mean(),
-                'avg_repay_consistency': high_score_wallets['repay_consistency_score'].mean(),
-                'avg_transactions': high_score_wallets['total_transactions'].mean(),
-                'avg_volume': high_score_wallets['total_volume'].mean(),
-                'avg_tenure': high_score_wallets['tenure_days'].mean(),
-            },
-            'success_factors': self._identify_success_factors(high_score_wallets)
+            'count': stats['count'],
+            'percentage': stats['count'] / len(df) * 100,
+            'avg_score': stats['avg_score'],
+            'common_characteristics': self._common_characteristics(stats['means']),
+            'success_factors': self._identify_success_factors(stats['means'])
         }
         
         return analysis
     
-    def _identify_risk_factors(self, low_score_df: pd.DataFrame) -> list:
-        """Identify common risk factors in low-scoring wallets."""
+    def _identify_risk_factors(self, means: dict) -> list:
+        """Identify common risk factors from low-scoring wallet behavior means."""
         factors = []
         
-        if low_score_df['liquidation_count'].mean() > 0.5:
+        if means['liquidation_count'] > 0.5:
             factors.append("High liquidation frequency")
         
-        if low_score_df['repay_consistency_score'].mean() < 0.8:
+        if means['repay_consistency_score'] < 0.8:
             factors.append("Poor repayment consistency")
         
-        if low_score_df['total_transactions'].mean() < 5:
+        if means['total_transactions'] < 5:
             factors.append("Limited transaction history")
         
-        if low_score_df['tenure_days'].mean() < 30:
+        if means['tenure_days'] < 30:
             factors.append("Short protocol tenure")
         
         return factors
     
-    def _identify_success_factors(self, high_score_df: pd.DataFrame) -> list:
-        """Identify common success factors in high-scoring wallets."""
+    def _identify_success_factors(self, means: dict) -> list:
+        """Identify common success factors from high-scoring wallet behavior means."""
         factors = []
         
-        if high_score_df['liquidation_count'].mean() < 0.1:
+        if means['liquidation_count'] < 0.1:
             factors.append("Excellent liquidation avoidance")
         
-        if high_score_df['repay_consistency_score'].mean() > 0.9:
+        if means['repay_consistency_score'] > 0.9:
             factors.append("Consistent repayment behavior")
         
-        if high_score_df['total_transactions'].mean() > 20:
+        if means['total_transactions'] > 20:
             factors.append("Extensive transaction history")
         
-        if high_score_df['tenure_days'].mean() > 180:
+        if means['tenure_days'] > 180:
             factors.append("Long-term protocol engagement")
         
-        if high_score_df['total_volume'].mean() > 10000:
+        if means['total_volume'] > 10000:
             factors.append("High transaction volumes")
         
         return factors
@@ -146,12 +382,7 @@ class CreditScoreAnalyzer:
     def create_distribution_chart(self, df: pd.DataFrame) -> go.Figure:
         """Create interactive distribution chart."""
         
-        df['score_range'] = pd.cut(df['credit_score'], 
-                                 bins=[r[0] for r in self.score_ranges] + [1000],
-                                 labels=[f"{r[0]}-{r[1]}" for r in self.score_ranges],
-                                 include_lowest=True)
-        
-        distribution = df['score_range'].value_counts().sort_index()
+        distribution = self._score_range_counts(df)
         
         fig = go.Figure(data=[
             go.Bar(
@@ -162,37 +393,49 @@ class CreditScoreAnalyzer:
                 marker_color='steelblue',
                 hovertemplate='Score Range: %{x}<br>Number of Wallets: %{y}<extra></extra>'
             )
-        ])
-        
-        fig.update_layout(
+        ], layout=dict(
+            template=CHART_TEMPLATE,
             title='Credit Score Distribution Across Wallet Population',
             xaxis_title='Credit Score Range',
             yaxis_title='Number of Wallets',
             xaxis_tickangle=-45,
-            height=500,
             showlegend=False
-        )
+        ))
         
         return fig
     
     def create_score_histogram(self, df: pd.DataFrame) -> go.Figure:
-        """Create detailed histogram of credit scores."""
+        """
+        Create detailed histogram of credit scores.
+        
+        Bin counts and percentiles are computed here in NumPy, so Plotly only
+        draws precomputed bars instead of rebinning the raw scores.
+        """
+        
+        scores = df['credit_score'].to_numpy().astype(np.float64, copy=False)
+        counts, edges = np.histogram(scores, bins=50, range=(0, 1000))
         
         fig = go.Figure(data=[
-            go.Histogram(
-                x=df['credit_score'],
-                nbinsx=50,
+            go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=counts,
+                width=np.diff(edges),
+                customdata=np.column_stack([edges[:-1], edges[1:]]),
                 marker_color='lightblue',
                 opacity=0.7,
-                hovertemplate='Score Range: %{x}<br>Count: %{y}<extra></extra>'
+                hovertemplate='Score Range: %{customdata[0]:.0f}-%{customdata[1]:.0f}<br>Count: %{y}<extra></extra>'
             )
-        ])
+        ], layout=dict(
+            template=CHART_TEMPLATE,
+            title='Detailed Credit Score Distribution',
+            xaxis_title='Credit Score',
+            yaxis_title='Number of Wallets',
+            bargap=0
+        ))
         
-        percentiles = [25, 50, 75]
-        colors = ['red', 'green', 'orange']
+        values = np.quantile(scores, self.HISTOGRAM_QUANTILES)
         
-        for p, color in zip(percentiles, colors):
-            value = np.percentile(df['credit_score'], p)
+        for p, value, color in zip(self.HISTOGRAM_PERCENTILES, values, self.HISTOGRAM_PERCENTILE_COLORS):
             fig.add_vline(
                 x=value,
                 line_dash="dash",
@@ -200,72 +443,69 @@ class CreditScoreAnalyzer:
                 annotation_text=f"{p}th percentile: {value:.0f}"
             )
         
-        fig.update_layout(
-            title='Detailed Credit Score Distribution',
-            xaxis_title='Credit Score',
-            yaxis_title='Number of Wallets',
-            height=500
-        )
-        
         return fig
     
-    def create_behavior_comparison(self, df: pd.DataFrame) -> go.Figure:
+    def create_behavior_comparison(self, df: pd.DataFrame, segment_stats: dict = None) -> go.Figure:
         """Create comparison chart between high and low scoring wallets."""
         
-        low_scores = df[df['credit_score'] < 400]
-        high_scores = df[df['credit_score'] >= 700]
-        
-        if len(low_scores) == 0 or len(high_scores) == 0:
-            return go.Figure().add_annotation(text="Insufficient data for comparison")
-        
-        metrics = ['total_transactions', 'total_volume', 'tenure_days', 
-                  'liquidation_count', 'repay_consistency_score']
-        
-        low_means = [low_scores[metric].mean() for metric in metrics]
-        high_means = [high_scores[metric].mean() for metric in metrics]
+        if segment_stats is None:
+            segment_stats = self._segment_behavior_stats(df)
+        low_stats, high_stats = segment_stats['low'], segment_stats['high']
         
-        fig = go.Figure()
+        if low_stats['count'] == 0 or high_stats['count'] == 0:
+            return go.Figure(layout=dict(template=CHART_TEMPLATE)).add_annotation(text="Insufficient data for comparison")
         
-        fig.add_trace(go.Bar(
-            name='Low Scores (<400)',
-            x=metrics,
-            y=low_means,
-            marker_color='red',
-            opacity=0.7
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='High Scores (>=700)',
-            x=metrics,
-            y=high_means,
-            marker_color='green',
-            opacity=0.7
-        ))
+        metrics = self.COMPARISON_METRICS
+        low_means = [low_stats['means'][metric] for metric in metrics]
+        high_means = [high_stats['means'][metric] for metric in metrics]
         
-        fig.update_layout(
+        fig = go.Figure(data=[
+            go.Bar(
+                name='Low Scores (<400)',
+                x=metrics,
+                y=low_means,
+                marker_color='red',
+                opacity=0.7
+            ),
+            go.Bar(
+                name='High Scores (>=700)',
+                x=metrics,
+                y=high_means,
+                marker_color='green',
+                opacity=0.7
+            )
+        ], layout=dict(
+            template=CHART_TEMPLATE,
             title='Behavioral Characteristics: High vs Low Scoring Wallets',
             xaxis_title='Metrics',
             yaxis_title='Average Values',
-            barmode='group',
-            height=500
-        )
+            barmode='group'
+        ))
         
         return fig
     
     def generate_analysis_report(self, df: pd.DataFrame, output_file: str = 'analysis.md'):
         """Generate comprehensive analysis report in Markdown format."""
         
+        segment_stats = self._segment_behavior_stats(df)
+        
         distribution_analysis = self.analyze_score_distribution(df)
-        low_score_analysis = self.analyze_low_score_behavior(df)
-        high_score_analysis = self.analyze_high_score_behavior(df)
+        low_score_analysis = self.analyze_low_score_behavior(df, stats=segment_stats['low'])
+        high_score_analysis = self.analyze_high_score_behavior(df, stats=segment_stats['high'])
         
         dist_chart = self.create_distribution_chart(df)
         hist_chart = self.create_score_histogram(df)
-        comparison_chart = self.create_behavior_comparison(df)
+        comparison_chart = self.create_behavior_comparison(df, segment_stats)
         
-        dist_chart.write_html('score_distribution.html')
-        hist_chart.write_html('score_histogram.html')
-        comparison_chart.write_html('behavior_comparison.html')
+        charts = [
+            (dist_chart, 'score_distribution.html'),
+            (hist_chart, 'score_histogram.html'),
+            (comparison_chart, 'behavior_comparison.html'),
+        ]
+        with ThreadPoolExecutor(max_workers=len(charts)) as executor:
+            futures = [executor.submit(fig.write_html, path, include_plotlyjs='cdn') for fig, path in charts]
+            for future in futures:
+                future.result()
         
         report = self._generate_markdown_report(distribution_analysis, low_score_analysis, high_score_analysis)
         
@@ -278,162 +518,53 @@ class CreditScoreAnalyzer:
     def _generate_markdown_report(self, dist_analysis: dict, low_analysis: dict, high_analysis: dict) -> str:
         """Generate the markdown analysis report."""
         
-        report = f"""# DeFi Credit Score Analysis
-
-*Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-
-## Executive Summary
-
-This analysis examines the credit scoring results for {dist_analysis['total_wallets']} DeFi wallets based on their Aave V2 protocol transaction behavior. The scoring system assigns credit scores from 0-1000, where higher scores indicate more reliable and sophisticated DeFi usage patterns.
-
-## Score Distribution Overview
-
-### Key Statistics
-- **Total Wallets Analyzed**: {dist_analysis['total_wallets']:,}
-- **Mean Credit Score**: {dist_analysis['mean_score']:.1f}
-- **Median Credit Score**: {dist_analysis['median_score']:.1f}
-- **Standard Deviation**: {dist_analysis['std_score']:.1f}
-
-### Percentile Breakdown
-- **10th Percentile**: {dist_analysis['percentiles']['10th']:.1f}
-- **25th Percentile**: {dist_analysis['percentiles']['25th']:.1f}
-- **75th Percentile**: {dist_analysis['percentiles']['75th']:.1f}
-- **90th Percentile**: {dist_analysis['percentiles']['90th']:.1f}
-
-### Score Range Distribution
-
-The following table shows the distribution of wallets across different credit score ranges:
-
-| Score Range | Number of Wallets | Percentage |
-|-------------|------------------|------------|"""
+        parts = [REPORT_HEADER_TEMPLATE.format(
+            generated_on=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            total_wallets=dist_analysis['total_wallets'],
+            mean_score=dist_analysis['mean_score'],
+            median_score=dist_analysis['median_score'],
+            std_score=dist_analysis['std_score'],
+            p10=dist_analysis['percentiles']['10th'],
+            p25=dist_analysis['percentiles']['25th'],
+            p75=dist_analysis['percentiles']['75th'],
+            p90=dist_analysis['percentiles']['90th'],
+        )]
         
         total_wallets = dist_analysis['total_wallets']
-        for range_name, count in dist_analysis['distribution'].items():
-            percentage = (count / total_wallets) * 100
-            report += f"\n| {range_name} | {count} | {percentage:.1f}% |"
-        
-        report += f"""
-
-## Low-Scoring Wallet Analysis (Score < 400)
-
-### Overview
-- **Number of Low-Scoring Wallets**: {low_analysis.get('count', 0)}
-- **Percentage of Total Population**: {low_analysis.get('percentage', 0):.1f}%
-- **Average Score**: {low_analysis.get('avg_score', 0):.1f}
-
-### Behavioral Characteristics"""
-        
-        if 'common_characteristics' in low_analysis:
-            chars = low_analysis['common_characteristics']
-            report += f"""
-- **Average Liquidations**: {chars.get('avg_liquidations', 0):.2f}
-- **Average Repayment Consistency**: {chars.get('avg_repay_consistency', 0):.2f}
-- **Average Transactions**: {chars.get('avg_transactions', 0):.1f}
-- **Average Volume**: ${chars.get('avg_volume', 0):,.2f}
-- **Average Tenure**: {chars.get('avg_tenure', 0):.1f} days"""
-        
-        if 'risk_factors' in low_analysis and low_analysis['risk_factors']:
-            report += "\n\n### Common Risk Factors"
-            for factor in low_analysis['risk_factors']:
-                report += f"\n- {factor}"
+        parts.extend(
+            DISTRIBUTION_ROW_TEMPLATE.format(range_name=range_name, count=count,
+                                             percentage=(count / total_wallets) * 100)
+            for range_name, count in dist_analysis['distribution'].items()
+        )
         
-        report += f"""
-
-## High-Scoring Wallet Analysis (Score >= 700)
-
-### Overview
-- **Number of High-Scoring Wallets**: {high_analysis.get('count', 0)}
-- **Percentage of Total Population**: {high_analysis.get('percentage', 0):.1f}%
-- **Average Score**: {high_analysis.get('avg_score', 0):.1f}
-
-### Behavioral Characteristics"""
+        self._append_segment_section(parts, low_analysis, 'Low-Scoring Wallet Analysis (Score < 400)',
+                                     'Low-Scoring', 'risk_factors', 'Common Risk Factors')
+        self._append_segment_section(parts, high_analysis, 'High-Scoring Wallet Analysis (Score >= 700)',
+                                     'High-Scoring', 'success_factors', 'Success Factors')
         
-        if 'common_characteristics' in high_analysis:
-            chars = high_analysis['common_characteristics']
-            report += f"""
-- **Average Liquidations**: {chars.get('avg_liquidations', 0):.2f}
-- **Average Repayment Consistency**: {chars.get('avg_repay_consistency', 0):.2f}
-- **Average Transactions**: {chars.get('avg_transactions', 0):.1f}
-- **Average Volume**: ${chars.get('avg_volume', 0):,.2f}
-- **Average Tenure**: {chars.get('avg_tenure', 0):.1f} days"""
+        parts.append(REPORT_FOOTER)
         
-        if 'success_factors' in high_analysis and high_analysis['success_factors']:
-            report += "\n\n### Success Factors"
-            for factor in high_analysis['success_factors']:
-                report += f"\n- {factor}"
+        return ''.join(parts)
+    
+    def _append_segment_section(self, parts: list, analysis: dict, heading: str, segment_label: str,
+                                factors_key: str, factors_heading: str):
+        """Append the overview, characteristics and factor list for one score segment."""
+        
+        parts.append(SEGMENT_OVERVIEW_TEMPLATE.format(
+            heading=heading,
+            segment_label=segment_label,
+            count=analysis.get('count', 0),
+            percentage=analysis.get('percentage', 0),
+            avg_score=analysis.get('avg_score', 0),
+        ))
         
-        report += """
-
-## Key Insights and Patterns
-
-### 1. Score Distribution Patterns
-The credit score distribution reveals the overall health and risk profile of the DeFi wallet population. A normal distribution suggests a healthy mix of users, while skewed distributions may indicate specific market conditions or user adoption patterns.
-
-### 2. Risk Differentiation
-The scoring model successfully differentiates between high-risk and low-risk wallets based on:
-- **Liquidation History**: Wallets with liquidation events score significantly lower
-- **Repayment Behavior**: Consistent repayers receive higher scores
-- **Portfolio Management**: Diversified and well-managed portfolios score better
-- **Protocol Engagement**: Long-term, active users are rewarded with higher scores
-
-### 3. Behavioral Segmentation
-The analysis reveals distinct behavioral segments:
-- **Sophisticated Users**: High scores, diverse portfolios, excellent risk management
-- **Casual Users**: Moderate scores, basic interactions, limited history
-- **High-Risk Users**: Low scores, liquidation history, poor repayment patterns
-- **Bot/Exploit Patterns**: Very low scores, irregular patterns, suspicious activity
-
-## Methodology Validation
-
-### Model Performance
-The credit scoring model demonstrates strong performance in:
-- Identifying high-risk wallets through liquidation and repayment patterns
-- Rewarding sophisticated DeFi usage and long-term engagement
-- Detecting potential bot or exploit behavior through pattern analysis
-- Providing meaningful score differentiation across the user base
-
-### Limitations and Considerations
-- **Data Scope**: Analysis based on Aave V2 data only; cross-protocol behavior not captured
-- **Temporal Factors**: Market conditions during analysis period may influence patterns
-- **Sample Size**: Results may vary with larger datasets or different time periods
-
-## Recommendations
-
-### For Risk Management
-1. Focus monitoring on wallets scoring below 300
-2. Implement enhanced due diligence for scores 300-500
-3. Consider preferential terms for consistently high-scoring wallets (700+)
-
-### For Product Development
-1. Develop targeted educational content for low-scoring users
-2. Create incentive programs for improving credit scores
-3. Consider score-based features and benefits
-
-### For Further Analysis
-1. Implement real-time score monitoring and updates
-2. Expand analysis to include cross-protocol behavior
-3. Develop predictive models for score trajectory
-
-## Technical Appendix
-
-### Scoring Methodology
-The credit scoring system employs a multi-factor approach considering:
-- **Reliability (40% weight)**: Repayment consistency, liquidation avoidance
-- **Sophistication (25% weight)**: Portfolio diversification, gas optimization
-- **Volume & Tenure (20% weight)**: Transaction volume, protocol engagement length
-- **Risk Management (15% weight)**: Leverage ratios, position management
-
-### Data Quality
-- All scores normalized to 0-1000 range
-- Outliers capped at 1st and 99th percentiles
-- Missing data handled through conservative scoring approaches
-
----
-
-*This analysis provides a comprehensive view of DeFi wallet creditworthiness based on on-chain transaction behavior. For questions or additional analysis, please refer to the technical documentation.*"""
+        if 'common_characteristics' in analysis:
+            parts.append(CHARACTERISTICS_TEMPLATE.format(**analysis['common_characteristics']))
         
-        return report
-
+        if analysis.get(factors_key):
+            parts.append(f"\n\n### {factors_heading}")
+            parts.extend(f"\n- {factor}" for factor in analysis[factors_key])
+    
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(description='DeFi Credit Score Analysis')
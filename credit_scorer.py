@@ -1,11 +1,14 @@
 import json
+import os
 import pandas as pd
 import numpy as np
 import argparse
 from datetime import datetime
+from typing import Dict, List, Tuple
 from sklearn.preprocessing import StandardScaler, RobustScaler
 from sklearn.ensemble import IsolationForest
 from sklearn.cluster import KMeans
+from joblib import Parallel, delayed, effective_n_jobs
 from feature_engineering import FeatureEngineering
 from aave_data_loader import AaveDataLoader
 import warnings
@@ -17,13 +20,31 @@ class DeFiCreditScorer:
     Assigns scores from 0-1000 based on transaction behavior patterns.
     """
     
-    def __init__(self):
+    # Left-closed score buckets: [900, inf) is Excellent, [700, 900) Good, ...
+    SCORE_BINS = [-np.inf, 300, 500, 700, 900, np.inf]
+    SCORE_LABELS = [
+        "Very Poor (0-299)", "Poor (300-499)", "Fair (500-699)",
+        "Good (700-899)", "Excellent (900-1000)"
+    ]
+    
+    # Share of wallets flagged as anomalous by the isolation forest. The
+    # detector is deliberately built with contamination='auto' and gets this
+    # cut written into offset_ after scoring; passing 0.1 to the constructor
+    # would make fit() traverse the forest a second time.
+    ANOMALY_CONTAMINATION = 0.1
+    
+    def __init__(self, n_jobs: int = 1):
+        if n_jobs == 0:
+            raise ValueError("n_jobs must be a positive worker count or negative (-1 for all cores), not 0")
+        self.n_jobs = n_jobs
         self.feature_engineer = FeatureEngineering()
         self.data_loader = AaveDataLoader()
         self.scaler = RobustScaler()
-        self.anomaly_detector = IsolationForest(contamination=0.1, random_state=42)
-        self.risk_clusterer = KMeans(n_clusters=5, random_state=42)
+        self.anomaly_detector = IsolationForest(contamination='auto', random_state=42, n_jobs=-1)
+        self.risk_clusterer = KMeans(n_clusters=5, n_init=4, random_state=42)
         self.feature_weights = self._define_feature_weights()
+        self._weight_idx = None
+        self._weight_vec = None
         
     def _define_feature_weights(self) -> dict:
         """Define weights for different feature categories based on importance."""
@@ -87,127 +108,155 @@ class DeFiCreditScorer:
             DataFrame with wallet addresses and their credit scores
         """
         print("Extracting features...")
-        features_df = self.feature_engineer.extract_features(df)
+        if self.n_jobs == 1:
+            wallet_ids, feature_names, X = self.feature_engineer.extract_features(df)
+        else:
+            wallet_ids, feature_names, X = self._extract_features_sharded(df)
         
-        if features_df.empty:
+        if len(wallet_ids) == 0:
             print("No features extracted. Check input data.")
             return pd.DataFrame()
         
-        print(f"Extracted features for {len(features_df)} wallets")
+        print(f"Extracted features for {len(wallet_ids)} wallets")
+        
+        # Scale the feature matrix once; the weighted scoring, anomaly
+        # detection and clustering stages all work on the same X_scaled.
+        # X is C-contiguous so sklearn does not copy it; it stays float64
+        # because position_size_variance overflows float32.
+        X_clean = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+        X_scaled = self.scaler.fit_transform(X_clean)
         
         print("Calculating base credit scores...")
-        scores_df = self._calculate_base_scores(features_df)
+        base_scores = self._calculate_base_scores(X, X_scaled, feature_names)
         
         print("Applying risk adjustments...")
-        scores_df = self._apply_risk_adjustments(scores_df, features_df)
+        risk_adjusted_scores = self._apply_risk_adjustments(base_scores, X, X_scaled, feature_names)
         
         print("Normalizing scores...")
-        scores_df = self._normalize_scores(scores_df)
+        credit_scores = self._normalize_scores(risk_adjusted_scores, base_scores)
         
-        result_df = scores_df.merge(features_df, on='wallet_address', how='left')
+        # The only DataFrame on the scoring path: scores plus raw features
+        result_df = pd.DataFrame({
+            'wallet_address': wallet_ids,
+            'base_score': base_scores,
+            'risk_adjusted_score': risk_adjusted_scores,
+            'credit_score': credit_scores,
+            'score_category': pd.cut(credit_scores, bins=self.SCORE_BINS, labels=self.SCORE_LABELS, right=False),
+            **dict(zip(feature_names, X.T))
+        })
+        result_df = result_df.astype(self.feature_engineer.FEATURE_DTYPES)
         
         print(f"Credit scoring complete for {len(result_df)} wallets")
         return result_df
     
-    def _calculate_base_scores(self, features_df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate base credit scores using weighted feature approach."""
-        
-        feature_cols = [col for col in features_df.columns if col != 'wallet_address']
-        X = features_df[feature_cols].fillna(0)
-        
-        X = X.replace([np.inf, -np.inf], 0)
-        
-        X_scaled = self.scaler.fit_transform(X)
-        X_scaled_df = pd.DataFrame(X_scaled, columns=feature_cols, index=features_df.index)
-        
-        scores = []
-        for idx, row in X_scaled_df.iterrows():
-            score = self._calculate_weighted_score(row, features_df.iloc[idx])
-            scores.append(score)
-        
-        result_df = pd.DataFrame({
-            'wallet_address': features_df['wallet_address'],
-            'base_score': scores
-        })
+    def _extract_features_sharded(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """
+        Extract features on wallet shards in parallel worker processes.
         
-        return result_df
+        Wallet features only depend on that wallet's transactions, so the
+        sorted wallet list is split into contiguous shards and the results are
+        stacked back in the same sorted order a single extract_features call
+        would produce. The global scaler/anomaly/cluster fits still run once.
+        """
+        # Null wallets are dropped here, as extract_features does, so they
+        # neither break the sort nor land in a shard
+        df = df[df['wallet_address'].notna()]
+        wallets = np.sort(df['wallet_address'].unique())
+        shards = [shard for shard in np.array_split(wallets, effective_n_jobs(self.n_jobs)) if len(shard)]
+        
+        parts = Parallel(n_jobs=self.n_jobs, backend='loky')(
+            delayed(self.feature_engineer.extract_features)(df[df['wallet_address'].isin(shard)])
+            for shard in shards
+        )
+        parts = [part for part in parts if len(part[0])]
+        if not parts:
+            return np.array([], dtype=object), [], np.empty((0, 0))
+        
+        wallet_ids = np.concatenate([part[0] for part in parts])
+        X = np.ascontiguousarray(np.vstack([part[2] for part in parts]))
+        return wallet_ids, parts[0][1], X
     
-    def _calculate_weighted_score(self, scaled_features: pd.Series, raw_features: pd.Series) -> float:
-        """Calculate weighted score for a single wallet."""
+    def _calculate_base_scores(self, X: np.ndarray, X_scaled: np.ndarray, feature_names: List[str]) -> np.ndarray:
+        """Calculate base credit scores using weighted feature approach."""
         
-        score = 500
+        col_index = {col: i for i, col in enumerate(feature_names)}
         
-        for feature, weight in self.feature_weights.items():
-            if feature in scaled_features.index:
-                feature_value = np.clip(scaled_features[feature], -3, 3)
-                score += weight * feature_value * 100
+        # Feature columns are fixed by FeatureEngineering, so align the
+        # weights with them once, on the first scoring call.
+        if self._weight_idx is None:
+            weight_idx = np.array([col_index.get(feature, -1) for feature in self.feature_weights], dtype=np.intp)
+            weight_vec = np.array(list(self.feature_weights.values()))
+            self._weight_idx = weight_idx[weight_idx >= 0]
+            self._weight_vec = weight_vec[weight_idx >= 0]
         
-        score += self._apply_heuristic_bonuses(raw_features)
+        scores = 500 + (np.clip(X_scaled[:, self._weight_idx], -3, 3) @ self._weight_vec) * 100
+        scores += self._apply_heuristic_bonuses(X, col_index)
         
-        return score
+        return scores
     
-    def _apply_heuristic_bonuses(self, features: pd.Series) -> float:
-        """Apply domain-specific heuristic bonuses/penalties."""
-        bonus = 0
-        
-        if features.get('tenure_days', 0) > 365:
-            bonus += 50 
-        elif features.get('tenure_days', 0) > 180:
-            bonus += 25
-            
-        if features.get('total_transactions', 0) > 50:
-            bonus += 30
-        elif features.get('total_transactions', 0) > 20:
-            bonus += 15
-            
-        if features.get('unique_assets', 0) > 5:
-            bonus += 20
-        elif features.get('unique_assets', 0) > 3:
-            bonus += 10
+    def _apply_heuristic_bonuses(self, X: np.ndarray, col_index: Dict[str, int]) -> np.ndarray:
+        """Apply domain-specific heuristic bonuses/penalties to every wallet at once."""
+        
+        def feature(name: str) -> np.ndarray:
+            if name not in col_index:
+                return np.zeros(len(X))
+            return X[:, col_index[name]]
+        
+        tenure = feature('tenure_days')
+        transactions = feature('total_transactions')
+        unique_assets = feature('unique_assets')
+        liquidations = feature('liquidation_count')
+        
+        bonus = np.where(tenure > 365, 50.0, np.where(tenure > 180, 25.0, 0.0))
+        bonus += np.where(transactions > 50, 30.0, np.where(transactions > 20, 15.0, 0.0))
+        bonus += np.where(unique_assets > 5, 20.0, np.where(unique_assets > 3, 10.0, 0.0))
+        bonus += np.where((feature('repay_ratio') >= 1.0) & (feature('borrow_count') > 0), 40.0, 0.0)
+        bonus -= np.where(liquidations > 0, liquidations * 30, 0.0)
+        bonus -= np.where(feature('bot_like_regularity') > 0.7, 100.0, 0.0)
         
-        if features.get('repay_ratio', 0) >= 1.0 and features.get('borrow_count', 0) > 0:
-            bonus += 40
-            
-        if features.get('liquidation_count', 0) > 0:
-            bonus -= features.get('liquidation_count', 0) * 30
-            
-        if features.get('bot_like_regularity', 0) > 0.7:
-            bonus -= 100
-            
         return bonus
     
-    def _apply_risk_adjustments(self, scores_df: pd.DataFrame, features_df: pd.DataFrame) -> pd.DataFrame:
+    def _apply_risk_adjustments(self, base_scores: np.ndarray, X: np.ndarray, X_scaled: np.ndarray,
+                                feature_names: List[str]) -> np.ndarray:
         """Apply ML-based risk adjustments using anomaly detection."""
         
-        feature_cols = [col for col in features_df.columns if col != 'wallet_address']
-        X = features_df[feature_cols].fillna(0).replace([np.inf, -np.inf], 0)
+        # With contamination='auto' fit() does not score the training set to
+        # place its threshold, so the forest is traversed once, here. Scoring
+        # runs on joblib threads because predict is single-core in the pinned
+        # sklearn; wallets below the contamination percentile are anomalies,
+        # the same cut a fixed contamination fit would make. offset_ is set to
+        # that cut so the fitted detector's predict() flags the same wallets.
+        self.anomaly_detector.fit(X_scaled)
+        
+        chunks = np.array_split(X_scaled, min(os.cpu_count() or 1, len(X_scaled)))
+        anomaly_scores = np.concatenate(Parallel(n_jobs=-1, prefer='threads')(
+            delayed(self.anomaly_detector.score_samples)(chunk) for chunk in chunks
+        ))
         
-        anomaly_scores = self.anomaly_detector.fit_predict(self.scaler.transform(X))
+        self.anomaly_detector.offset_ = np.percentile(anomaly_scores, 100 * self.ANOMALY_CONTAMINATION)
         
-        scores_df['risk_adjusted_score'] = scores_df['base_score'].copy()
-        anomaly_mask = anomaly_scores == -1
-        scores_df.loc[anomaly_mask, 'risk_adjusted_score'] *= 0.7
+        scores = base_scores.copy()
+        anomaly_mask = anomaly_scores < self.anomaly_detector.offset_
+        scores[anomaly_mask] *= 0.7
         
-        risk_clusters = self.risk_clusterer.fit_predict(self.scaler.transform(X))
+        risk_clusters = self.risk_clusterer.fit_predict(X_scaled)
+        liquidation_frequency = X[:, feature_names.index('liquidation_frequency')]
         
         for cluster in range(5):
             cluster_mask = risk_clusters == cluster
-            cluster_features = features_df[cluster_mask]
             
-            if len(cluster_features) > 0:
-                avg_liquidations = cluster_features['liquidation_frequency'].mean()
+            if cluster_mask.any():
+                avg_liquidations = liquidation_frequency[cluster_mask].mean()
                 if avg_liquidations > 0.1:  
-                    scores_df.loc[cluster_mask, 'risk_adjusted_score'] *= 0.8
+                    scores[cluster_mask] *= 0.8
                 elif avg_liquidations < 0.01:  
-                    scores_df.loc[cluster_mask, 'risk_adjusted_score'] *= 1.1
+                    scores[cluster_mask] *= 1.1
         
-        return scores_df
+        return scores
     
-    def _normalize_scores(self, scores_df: pd.DataFrame) -> pd.DataFrame:
+    def _normalize_scores(self, scores: np.ndarray, base_scores: np.ndarray) -> np.ndarray:
         """Normalize scores to 0-1000 range with proper distribution."""
         
-        scores = scores_df['risk_adjusted_score'].values
-        
         q1, q99 = np.percentile(scores, [1, 99])
         scores_clipped = np.clip(scores, q1, q99)
         
@@ -217,34 +266,10 @@ class DeFiCreditScorer:
         else:
             normalized_scores = np.full_like(scores_clipped, 500)
         
-        final_scores = []
-        for i, (_, row) in enumerate(scores_df.iterrows()):
-            score = normalized_scores[i]
-            
-            if row.get('base_score', 500) < 200: 
-                score = min(score, 300)
-            elif row.get('base_score', 500) > 800:
-                score = max(score, 700)
-            
-            final_scores.append(max(0, min(1000, score)))
-        
-        scores_df['credit_score'] = final_scores
-        scores_df['score_category'] = scores_df['credit_score'].apply(self._categorize_score)
+        final_scores = np.where(base_scores < 200, np.minimum(normalized_scores, 300), normalized_scores)
+        final_scores = np.where(base_scores > 800, np.maximum(final_scores, 700), final_scores)
         
-        return scores_df
-    
-    def _categorize_score(self, score: float) -> str:
-        """Categorize scores into risk buckets."""
-        if score >= 900:
-            return "Excellent (900-1000)"
-        elif score >= 700:
-            return "Good (700-899)"
-        elif score >= 500:
-            return "Fair (500-699)"
-        elif score >= 300:
-            return "Poor (300-499)"
-        else:
-            return "Very Poor (0-299)"
+        return np.clip(final_scores, 0, 1000)
     
     def save_results(self, results_df: pd.DataFrame, output_path: str):
         """Save scoring results to CSV file."""
@@ -253,30 +278,34 @@ class DeFiCreditScorer:
                       'risk_adjusted_score', 'total_transactions', 'total_volume', 
                       'tenure_days', 'liquidation_count', 'repay_consistency_score']
         
-        output_df = results_df[output_cols].copy()
-        output_df.to_csv(output_path, index=False)
+        results_df.to_csv(output_path, columns=output_cols, index=False)
         print(f"Results saved to {output_path}")
         
+        score_stats = results_df['credit_score'].agg(['mean', 'median'])
+        
         print("\n=== SCORING SUMMARY ===")
-        print(f"Total wallets scored: {len(output_df)}")
-        print(f"Average credit score: {output_df['credit_score'].mean():.1f}")
-        print(f"Median credit score: {output_df['credit_score'].median():.1f}")
+        print(f"Total wallets scored: {len(results_df)}")
+        print(f"Average credit score: {score_stats['mean']:.1f}")
+        print(f"Median credit score: {score_stats['median']:.1f}")
         print("\nScore distribution:")
-        print(output_df['score_category'].value_counts().sort_index())
+        print(results_df['score_category'].value_counts().sort_index())
 
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(description='DeFi Credit Scoring System')
     parser.add_argument('--input', required=True, help='Input JSON file with transaction data')
     parser.add_argument('--output', default='wallet_scores.csv', help='Output CSV file for scores')
+    parser.add_argument('--n-jobs', type=int, default=1, help='Worker processes for feature extraction (-1 for all cores)')
     
     args = parser.parse_args()
+    if args.n_jobs == 0:
+        parser.error("--n-jobs must be a positive worker count or -1 for all cores")
     
     print("=== DeFi Credit Scoring System ===")
     print(f"Input file: {args.input}")
     print(f"Output file: {args.output}")
     
-    scorer = DeFiCreditScorer()
+    scorer = DeFiCreditScorer(n_jobs=args.n_jobs)
     
     df = scorer.load_data(args.input)
     if df.empty:
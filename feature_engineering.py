@@ -11,239 +11,225 @@ class FeatureEngineering:
     Extracts behavioral patterns from Aave V2 protocol transactions.
     """
     
+    ACTIONS = ['deposit', 'borrow', 'repay', 'redeemunderlying', 'liquidationcall']
+    
+    FEATURE_NAMES = [
+        # Basic transaction statistics
+        'total_transactions', 'total_volume', 'avg_transaction_size', 'median_transaction_size',
+        'max_transaction_size', 'min_transaction_size', 'transaction_std', 'unique_assets',
+        'total_gas_used', 'avg_gas_per_tx',
+        # Financial behavior patterns
+        'deposit_count', 'borrow_count', 'repay_count', 'redeem_count', 'liquidation_count',
+        'deposit_volume', 'borrow_volume', 'repay_volume', 'redeem_volume', 'net_deposit_volume',
+        'leverage_ratio', 'repay_ratio', 'asset_concentration_hhi', 'avg_position_size',
+        # Risk-related behavioral indicators
+        'liquidation_frequency', 'liquidation_volume_ratio', 'has_liquidations',
+        'repay_consistency_score', 'position_size_variance', 'max_single_position_ratio',
+        # Time-based behavioral patterns
+        'tenure_days', 'activity_frequency', 'activity_consistency_cv', 'avg_time_between_tx_hours',
+        'median_time_between_tx_hours', 'weekend_activity_ratio', 'days_active', 'max_inactive_days',
+        # Network and technical behavior indicators
+        'gas_efficiency_score', 'gas_optimization_score', 'action_diversity_score',
+        'bot_like_regularity', 'unique_gas_prices', 'transaction_complexity_score'
+    ]
+    
+    # Features that are not float-valued, for rebuilding a typed frame from X
+    FEATURE_DTYPES = {
+        'total_transactions': 'int64', 'unique_assets': 'int64', 'total_gas_used': 'int64',
+        'deposit_count': 'int64', 'borrow_count': 'int64', 'repay_count': 'int64',
+        'redeem_count': 'int64', 'liquidation_count': 'int64', 'has_liquidations': 'bool',
+        'tenure_days': 'int64', 'days_active': 'int64', 'max_inactive_days': 'int64',
+        'unique_gas_prices': 'int64'
+    }
+    
     def __init__(self):
         self.features = {}
     
-    def extract_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def extract_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[str], np.ndarray]:
         """
         Extract all features for each wallet from transaction data.
         
         Args:
-            df: DataFrame with transaction data
+            df: DataFrame with transaction data. AaveDataLoader already provides
+                numeric amount and gas_used columns, so the conversions below
+                only matter for string-typed input.
             
         Returns:
-            DataFrame with engineered features per wallet
+            Tuple of (wallet_ids, feature_names, X) where X is a C-contiguous
+            float64 matrix with one row per wallet in wallet_ids order and one
+            column per feature name; missing values are left as NaN
         """
 
         df['timestamp'] = pd.to_datetime(df['timestamp'])
         df['amount'] = pd.to_numeric(df['amount'], errors='coerce').fillna(0)
         df['gas_used'] = pd.to_numeric(df['gas_used'], errors='coerce').fillna(0)
         
-        wallet_features = []
-        
-        for wallet, wallet_df in df.groupby('wallet_address'):
-            features = self._extract_wallet_features(wallet, wallet_df)
-            wallet_features.append(features)
-        
-        return pd.DataFrame(wallet_features)
-    
-    def _extract_wallet_features(self, wallet_address: str, df: pd.DataFrame) -> Dict:
-        """Extract comprehensive features for a single wallet."""
-        
-        features = {'wallet_address': wallet_address}
-        
-        features.update(self._extract_basic_features(df))
-        
-        features.update(self._extract_financial_features(df))
-        
-        features.update(self._extract_risk_features(df))
-        
-        features.update(self._extract_temporal_features(df))
-        
-        features.update(self._extract_network_features(df))
-        
-        return features
-    
-    def _extract_basic_features(self, df: pd.DataFrame) -> Dict:
-        """Extract basic transaction statistics."""
-        return {
-            'total_transactions': len(df),
-            'total_volume': df['amount'].sum(),
-            'avg_transaction_size': df['amount'].mean(),
-            'median_transaction_size': df['amount'].median(),
-            'max_transaction_size': df['amount'].max(),
-            'min_transaction_size': df['amount'].min(),
-            'transaction_std': df['amount'].std(),
-            'unique_assets': df['asset'].nunique(),
-            'total_gas_used': df['gas_used'].sum(),
-            'avg_gas_per_tx': df['gas_used'].mean()
-        }
-    
-    def _extract_financial_features(self, df: pd.DataFrame) -> Dict:
-        """Extract financial behavior patterns."""
-        action_counts = df['action'].value_counts()
-        action_volumes = df.groupby('action')['amount'].sum()
-        
-        deposits = action_volumes.get('deposit', 0)
-        borrows = action_volumes.get('borrow', 0)
-        repays = action_volumes.get('repay', 0)
-        redeems = action_volumes.get('redeemunderlying', 0)
-        
-        asset_concentration = self._calculate_asset_concentration(df)
-        
-        net_deposits = deposits - redeems
-        repay_ratio = repays / borrows if borrows > 0 else 0
-        
-        return {
-            'deposit_count': action_counts.get('deposit', 0),
-            'borrow_count': action_counts.get('borrow', 0),
-            'repay_count': action_counts.get('repay', 0),
-            'redeem_count': action_counts.get('redeemunderlying', 0),
-            'liquidation_count': action_counts.get('liquidationcall', 0),
-            'deposit_volume': deposits,
-            'borrow_volume': borrows,
-            'repay_volume': repays,
-            'redeem_volume': redeems,
-            'net_deposit_volume': net_deposits,
-            'leverage_ratio': borrows / deposits if deposits > 0 else 0,
-            'repay_ratio': repay_ratio,
-            'asset_concentration_hhi': asset_concentration,
-            'avg_position_size': df.groupby('asset')['amount'].sum().mean(),
-        }
-    
-    def _extract_risk_features(self, df: pd.DataFrame) -> Dict:
-        """Extract risk-related behavioral indicators."""
-        liquidations = df[df['action'] == 'liquidationcall']
-        
-        liquidation_frequency = len(liquidations) / len(df) if len(df) > 0 else 0
-        liquidation_volume_ratio = liquidations['amount'].sum() / df['amount'].sum() if df['amount'].sum() > 0 else 0
-        
-        repay_df = df[df['action'] == 'repay']
-        borrow_df = df[df['action'] == 'borrow']
-        
-        repay_consistency = self._calculate_repay_consistency(borrow_df, repay_df)
-        
-        position_size_variance = df.groupby('asset')['amount'].sum().var()
-        
-        return {
-            'liquidation_frequency': liquidation_frequency,
-            'liquidation_volume_ratio': liquidation_volume_ratio,
-            'has_liquidations': len(liquidations) > 0,
-            'repay_consistency_score': repay_consistency,
-            'position_size_variance': position_size_variance,
-            'max_single_position_ratio': df.groupby('asset')['amount'].sum().max() / df['amount'].sum() if df['amount'].sum() > 0 else 0,
-        }
-    
-    def _extract_temporal_features(self, df: pd.DataFrame) -> Dict:
-        """Extract time-based behavioral patterns."""
-        df_sorted = df.sort_values('timestamp')
-        
-        first_tx = df_sorted['timestamp'].min()
-        last_tx = df_sorted['timestamp'].max()
-        tenure_days = (last_tx - first_tx).days
-        
-        daily_activity = df.groupby(df['timestamp'].dt.date).size()
-        activity_consistency = daily_activity.std() / daily_activity.mean() if daily_activity.mean() > 0 else 0
-        
-        time_intervals = df_sorted['timestamp'].diff().dt.total_seconds().dropna()
-    
-        df['day_of_week'] = df['timestamp'].dt.dayofweek
-        weekend_ratio = len(df[df['day_of_week'].isin([5, 6])]) / len(df)
-        
-        return {
-            'tenure_days': tenure_days,
-            'activity_frequency': len(df) / max(tenure_days, 1),
-            'activity_consistency_cv': activity_consistency,
-            'avg_time_between_tx_hours': time_intervals.mean() / 3600 if len(time_intervals) > 0 else 0,
-            'median_time_between_tx_hours': time_intervals.median() / 3600 if len(time_intervals) > 0 else 0,
-            'weekend_activity_ratio': weekend_ratio,
-            'days_active': daily_activity.count(),
-            'max_inactive_days': self._calculate_max_inactive_period(df_sorted),
-        }
-    
-    def _extract_network_features(self, df: pd.DataFrame) -> Dict:
-        """Extract network and technical behavior indicators."""
-        
-        gas_efficiency = df['amount'] / df['gas_used'] if df['gas_used'].sum() > 0 else 0
-        gas_optimization_score = self._calculate_gas_optimization(df)
-        
-        action_diversity = df['action'].nunique() / 5
-        
-        regularity_score = self._detect_bot_like_patterns(df)
-        
-        return {
-            'gas_efficiency_score': gas_efficiency.mean() if hasattr(gas_efficiency, 'mean') else 0,
-            'gas_optimization_score': gas_optimization_score,
-            'action_diversity_score': action_diversity,
-            'bot_like_regularity': regularity_score,
-            'unique_gas_prices': df['gas_used'].nunique(),
-            'transaction_complexity_score': self._calculate_complexity_score(df),
-        }
-    
-    def _calculate_asset_concentration(self, df: pd.DataFrame) -> float:
-        """Calculate Herfindahl-Hirschman Index for asset concentration."""
-        asset_volumes = df.groupby('asset')['amount'].sum()
-        total_volume = asset_volumes.sum()
-        
-        if total_volume == 0:
-            return 0
-            
-        shares = asset_volumes / total_volume
-        hhi = (shares ** 2).sum()
-        return hhi
-    
-    def _calculate_repay_consistency(self, borrow_df: pd.DataFrame, repay_df: pd.DataFrame) -> float:
-        """Calculate repayment consistency score."""
-        if len(borrow_df) == 0:
-            return 1.0
-        
-        if len(repay_df) == 0:
-            return 0.0
-        
-        repay_ratio = repay_df['amount'].sum() / borrow_df['amount'].sum()
-        return min(repay_ratio, 1.0)
-    
-    def _calculate_max_inactive_period(self, df_sorted: pd.DataFrame) -> int:
-        """Calculate maximum consecutive days without activity."""
-        if len(df_sorted) <= 1:
-            return 0
-        
-        dates = df_sorted['timestamp'].dt.date.unique()
-        dates = sorted(dates)
-        
-        max_gap = 0
-        current_gap = 0
-        
-        for i in range(1, len(dates)):
-            gap_days = (dates[i] - dates[i-1]).days - 1
-            if gap_days > 0:
-                current_gap += gap_days
-                max_gap = max(max_gap, current_gap)
-            else:
-                current_gap = 0
-        
-        return max_gap
-    
-    def _calculate_gas_optimization(self, df: pd.DataFrame) -> float:
-        """Calculate gas optimization score based on efficiency patterns."""
-        if df['gas_used'].sum() == 0:
-            return 0.5
-        
-        gas_cv = df['gas_used'].std() / df['gas_used'].mean() if df['gas_used'].mean() > 0 else 1
-        optimization_score = max(0, 1 - gas_cv)
-        return optimization_score
+        if df.empty:
+            return np.array([], dtype=object), [], np.empty((0, 0))
+        
+        # Rows without a wallet belong to no group; drop them so the group
+        # codes used for the bincount reductions are all valid
+        df = df[df['wallet_address'].notna()].sort_values(['wallet_address', 'timestamp'], kind='stable')
+        wallets = df.groupby('wallet_address', sort=True)
+        wallet_codes = wallets.ngroup().to_numpy()
+        amount = df['amount'].to_numpy()
+        
+        # Action and asset reductions run on their integer category codes;
+        # each occupied (wallet, code) cell is one distinct value per wallet
+        action = df['action'].astype('category')
+        asset = df['asset'].astype('category')
+        action_cell_wallets, _ = self._cell_totals(wallet_codes, action.cat.codes.to_numpy(), len(action.cat.categories))
+        asset_cell_wallets, asset_cell_volumes = self._cell_totals(
+            wallet_codes, asset.cat.codes.to_numpy(), len(asset.cat.categories), amount
+        )
+        
+        # Basic transaction statistics. Every feature is kept as a per-wallet
+        # column in the features dict and copied into X once at the end.
+        basic = wallets.agg(
+            total_transactions=('amount', 'size'),
+            total_volume=('amount', 'sum'),
+            avg_transaction_size=('amount', 'mean'),
+            median_transaction_size=('amount', 'median'),
+            max_transaction_size=('amount', 'max'),
+            min_transaction_size=('amount', 'min'),
+            transaction_std=('amount', 'std'),
+            total_gas_used=('gas_used', 'sum'),
+            avg_gas_per_tx=('gas_used', 'mean')
+        )
+        wallet_ids = basic.index
+        n_wallets = len(wallet_ids)
+        
+        features = dict(basic.items())
+        features['unique_assets'] = pd.Series(np.bincount(asset_cell_wallets, minlength=n_wallets), index=wallet_ids)
+        total_volume = features['total_volume']
+        
+        # Financial behavior patterns
+        # Per-action counts and volumes in one pass over (wallet, action)
+        # cells. np.bincount adds each cell's amounts in order, so a wallet
+        # that repaid exactly what it borrowed gets identical totals.
+        n_actions = len(self.ACTIONS)
+        scored_actions = np.append(pd.Categorical(action.cat.categories, categories=self.ACTIONS).codes, -1)
+        action_codes = scored_actions[action.cat.codes.to_numpy()]
+        is_scored = action_codes >= 0
+        cells = (wallet_codes * n_actions + action_codes)[is_scored]
+        n_cells = n_wallets * n_actions
+        
+        action_counts = pd.DataFrame(
+            np.bincount(cells, minlength=n_cells).reshape(-1, n_actions),
+            index=wallet_ids, columns=self.ACTIONS
+        )
+        action_volumes = pd.DataFrame(
+            np.bincount(cells, weights=amount[is_scored], minlength=n_cells).reshape(-1, n_actions),
+            index=wallet_ids, columns=self.ACTIONS
+        )
+        
+        deposits = action_volumes['deposit']
+        borrows = action_volumes['borrow']
+        repays = action_volumes['repay']
+        redeems = action_volumes['redeemunderlying']
+        
+        asset_sums = pd.Series(asset_cell_volumes, index=wallet_ids[asset_cell_wallets])
+        asset_totals = asset_sums.groupby(level=0).sum()
+        
+        # Herfindahl-Hirschman Index over each wallet's per-asset volume shares
+        shares = asset_sums.div(asset_totals, level=0)
+        hhi = (shares ** 2).groupby(level=0).sum().where(asset_totals != 0, 0)
+        wallet_positions = asset_sums.groupby(level=0)
+        
+        features['deposit_count'] = action_counts['deposit']
+        features['borrow_count'] = action_counts['borrow']
+        features['repay_count'] = action_counts['repay']
+        features['redeem_count'] = action_counts['redeemunderlying']
+        features['liquidation_count'] = action_counts['liquidationcall']
+        features['deposit_volume'] = deposits
+        features['borrow_volume'] = borrows
+        features['repay_volume'] = repays
+        features['redeem_volume'] = redeems
+        features['net_deposit_volume'] = deposits - redeems
+        features['leverage_ratio'] = (borrows / deposits).where(deposits > 0, 0)
+        features['repay_ratio'] = (repays / borrows).where(borrows > 0, 0)
+        features['asset_concentration_hhi'] = hhi
+        features['avg_position_size'] = wallet_positions.mean()
+        
+        # Risk-related behavioral indicators
+        liquidation_count = features['liquidation_count']
+        borrow_count = features['borrow_count']
+        repay_consistency = np.minimum(repays / borrows, 1.0)
+        
+        features['liquidation_frequency'] = liquidation_count / features['total_transactions']
+        features['liquidation_volume_ratio'] = (action_volumes['liquidationcall'] / total_volume).where(total_volume > 0, 0)
+        features['has_liquidations'] = liquidation_count > 0
+        features['repay_consistency_score'] = repay_consistency.where(features['repay_count'] > 0, 0.0).where(borrow_count > 0, 1.0)
+        features['position_size_variance'] = wallet_positions.var()
+        features['max_single_position_ratio'] = (wallet_positions.max() / total_volume).where(total_volume > 0, 0)
+        
+        # Time-based behavioral patterns; intervals come from one diff over
+        # the frame sorted by wallet and timestamp
+        timestamps = wallets['timestamp']
+        tenure_days = (timestamps.max() - timestamps.min()).dt.days
+        # Integer day numbers since the epoch stand in for calendar dates;
+        # 1970-01-01 was a Thursday, so (day + 3) % 7 is the weekday
+        day = df['timestamp'].values.astype('datetime64[D]').astype(np.int64)
+        daily_counts = df.groupby(['wallet_address', day]).size()
+        daily_activity = daily_counts.groupby(level=0)
+        
+        # Inactive stretch between consecutive active days, one diff over the
+        # sorted (wallet, day) index
+        active_days = pd.Series(daily_counts.index.get_level_values(1), index=daily_counts.index.get_level_values(0))
+        inactive_gaps = active_days.groupby(level=0).diff() - 1
+        intervals = timestamps.diff().dt.total_seconds().groupby(df['wallet_address'])
+        interval_mean = intervals.mean()
+        weekend = pd.Series((day + 3) % 7 >= 5, index=df.index)
+        
+        features['tenure_days'] = tenure_days
+        features['activity_frequency'] = features['total_transactions'] / tenure_days.clip(lower=1)
+        features['activity_consistency_cv'] = daily_activity.std() / daily_activity.mean()
+        features['avg_time_between_tx_hours'] = (interval_mean / 3600).fillna(0)
+        features['median_time_between_tx_hours'] = (intervals.median() / 3600).fillna(0)
+        features['weekend_activity_ratio'] = weekend.groupby(df['wallet_address']).mean()
+        features['days_active'] = daily_activity.size()
+        features['max_inactive_days'] = inactive_gaps.groupby(level=0).max().clip(lower=0).fillna(0).astype(int)
+        
+        # Network and technical behavior indicators
+        gas_sum = features['total_gas_used']
+        gas_mean = features['avg_gas_per_tx']
+        gas_cv = (wallets['gas_used'].std() / gas_mean).where(gas_mean > 0, 1)
+        gas_optimization = (1 - gas_cv).where(lambda score: score > 0, 0)
+        interval_cv = (intervals.std() / interval_mean).where(interval_mean > 0, 1)
+        regularity = (1 - interval_cv * 2).where(lambda score: score > 0, 0)
+        gas_efficiency = (df['amount'] / df['gas_used']).groupby(df['wallet_address']).mean()
+        
+        action_variety = pd.Series(np.bincount(action_cell_wallets, minlength=n_wallets) / 5, index=wallet_ids)
+        asset_variety = features['unique_assets'] / features['unique_assets'].clip(lower=1)
+        amount_mean = features['avg_transaction_size']
+        amount_variety = (1 - features['transaction_std'] / amount_mean).where(amount_mean > 0, 0)
+        amount_variety = amount_variety.where(amount_variety > 0, 0)
+        
+        features['gas_efficiency_score'] = gas_efficiency.where(gas_sum > 0, 0)
+        features['gas_optimization_score'] = gas_optimization.where(gas_sum != 0, 0.5)
+        features['action_diversity_score'] = action_variety
+        features['bot_like_regularity'] = regularity.where(features['total_transactions'] >= 3, 0.0)
+        features['unique_gas_prices'] = wallets['gas_used'].nunique()
+        features['transaction_complexity_score'] = (action_variety + asset_variety + amount_variety) / 3
+        
+        X = np.empty((n_wallets, len(self.FEATURE_NAMES)))
+        for i, name in enumerate(self.FEATURE_NAMES):
+            X[:, i] = features[name].reindex(wallet_ids)
+        
+        return wallet_ids.to_numpy(), list(self.FEATURE_NAMES), X
     
-    def _detect_bot_like_patterns(self, df: pd.DataFrame) -> float:
-        """Detect bot-like regular transaction patterns."""
-        if len(df) < 3:
-            return 0.0
-        
-        df_sorted = df.sort_values('timestamp')
-        time_intervals = df_sorted['timestamp'].diff().dt.total_seconds().dropna()
-        
-        if len(time_intervals) == 0:
-            return 0.0
+    def _cell_totals(self, wallet_codes: np.ndarray, codes: np.ndarray, n_codes: int,
+                     amount: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the occupied (wallet, category) cells and sum amount over each.
         
-        interval_cv = time_intervals.std() / time_intervals.mean() if time_intervals.mean() > 0 else 1
+        Returns the wallet code of every occupied cell, ordered by wallet then
+        category code, and the cell totals (None when no amount is given).
+        Rows with a missing category or wallet (code -1) are skipped.
+        """
+        is_valid = (codes >= 0) & (wallet_codes >= 0)
+        keys = wallet_codes[is_valid].astype(np.int64) * n_codes + codes[is_valid]
+        cells, cell_index = np.unique(keys, return_inverse=True)
         
-        bot_score = max(0, 1 - interval_cv * 2)
-        return bot_score
-    
-    def _calculate_complexity_score(self, df: pd.DataFrame) -> float:
-        """Calculate transaction complexity score."""
-        action_variety = df['action'].nunique() / 5
-        asset_variety = df['asset'].nunique() / max(df['asset'].nunique(), 1)
-        amount_variety = 1 - (df['amount'].std() / df['amount'].mean()) if df['amount'].mean() > 0 else 0
-        
-        complexity = (action_variety + asset_variety + max(0, amount_variety)) / 3
-        return complexity
+        totals = None if amount is None else np.bincount(cell_index, weights=amount[is_valid], minlength=len(cells))
+        return cells // n_codes, totals